@@ -0,0 +1,291 @@
+from __future__ import annotations
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, List as PyList, Type, TypeVar
+
+from basic_types import List
+from functional_typeclasses import *
+
+A = TypeVar("A")
+M = TypeVar("M")
+
+
+def _identity(a: Any) -> Any:
+    return a
+
+
+def _one(a: Any) -> int:
+    return 1
+
+
+def _min(a: Any, b: Any) -> Any:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return b if b < a else a
+
+
+def _max(a: Any, b: Any) -> Any:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return b if b > a else a
+
+
+@dataclass(frozen=True)
+class Aggregate(Generic[A, M]):
+    """A fold that can be maintained incrementally: every element is turned into
+    a value of some monoid with `measure`, and the measures are combined with
+    `combine`, starting from its identity `empty`.
+    """
+
+    combine: Callable[[M, M], M]
+    empty: M
+    measure: Callable[[A], M] = _identity
+
+    @classmethod
+    def sum(cls) -> Aggregate[Any, Any]:
+        return Aggregate(operator.add, 0)
+
+    @classmethod
+    def count(cls) -> Aggregate[Any, int]:
+        return Aggregate(operator.add, 0, _one)
+
+    @classmethod
+    def minimum(cls) -> Aggregate[Any, Any]:
+        """The smallest element, or `None` if there are none."""
+        return Aggregate(_min, None)
+
+    @classmethod
+    def maximum(cls) -> Aggregate[Any, Any]:
+        """The largest element, or `None` if there are none."""
+        return Aggregate(_max, None)
+
+    @classmethod
+    def of_monoid(
+        cls, monoid: Type[Monoid], measure: Callable[[A], Any] = _identity
+    ) -> Aggregate[A, Any]:
+        """Aggregates with a `Monoid` class, e.g. `List`, after mapping every
+        element into it with `measure`."""
+        return Aggregate(monoid.combine, monoid.empty(), measure)
+
+
+class _SegmentTree(Generic[M]):
+    """A complete binary tree of measures, where every inner node holds the
+    combination of its two children, in order. Leaves past the end hold the
+    identity, and the tree doubles in size whenever it runs out of leaves."""
+
+    def __init__(self, aggregate: Aggregate[Any, M], leaves: PyList[M]) -> None:
+        self._aggregate = aggregate
+        self._build(leaves)
+
+    def _build(self, leaves: PyList[M]) -> None:
+        capacity = 1
+        while capacity < len(leaves):
+            capacity *= 2
+        combine = self._aggregate.combine
+        tree = [self._aggregate.empty] * (2 * capacity)
+        tree[capacity:capacity + len(leaves)] = leaves
+        for i in range(capacity - 1, 0, -1):
+            tree[i] = combine(tree[2 * i], tree[2 * i + 1])
+        self._capacity = capacity
+        self._size = len(leaves)
+        self._tree = tree
+
+    def total(self) -> M:
+        return self._tree[1]
+
+    def leaves(self) -> PyList[M]:
+        return self._tree[self._capacity:self._capacity + self._size]
+
+    def set(self, i: int, leaf: M) -> None:
+        combine, tree = self._aggregate.combine, self._tree
+        i += self._capacity
+        tree[i] = leaf
+        i //= 2
+        while i:
+            tree[i] = combine(tree[2 * i], tree[2 * i + 1])
+            i //= 2
+
+    def append(self, leaf: M) -> None:
+        if self._size == self._capacity:
+            self._build(self.leaves() + [leaf])
+        else:
+            self._size += 1
+            self.set(self._size - 1, leaf)
+
+    def pop(self) -> None:
+        self._size -= 1
+        self.set(self._size, self._aggregate.empty)
+
+    def query(self, lo: int, hi: int) -> M:
+        combine, tree = self._aggregate.combine, self._tree
+        left = right = self._aggregate.empty
+        lo += self._capacity
+        hi += self._capacity
+        while lo < hi:
+            if lo & 1:
+                left = combine(left, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = combine(tree[hi], right)
+            lo //= 2
+            hi //= 2
+        return combine(left, right)
+
+
+class AggregatedList(List[A]):
+    """A `List` that keeps a set of named `Aggregate`s up to date as elements
+    are appended, so reading them never requires refolding the whole list.
+    `append` and `extend` change the list in place; everything inherited from
+    `List` (`map`, `foldl`, ...) behaves as before and returns plain `List`s.
+
+    By default only the running totals are kept, which costs one `combine` per
+    aggregate per appended element. With `indexed=True` a segment tree is kept
+    for every aggregate instead, which also allows `pop`, replacing elements,
+    and folding any range of the list in O(log n).
+
+    >>> sales = AggregatedList([3, 1, 4], total=Aggregate.sum(), low=Aggregate.minimum())
+    >>> sales.append(0).extend([5, 9])
+    AggregatedList(3, 1, 4, 0, 5, 9)
+    >>> sales.aggregate("total"), sales.aggregate("low")
+    (22, 0)
+
+    >>> words = AggregatedList(["fold", "map"], indexed=True,
+    ...                        longest=Aggregate.maximum(),
+    ...                        joined=Aggregate.of_monoid(List, List.of))
+    >>> words.append("chain").aggregate("joined")
+    List('fold', 'map', 'chain')
+    >>> words[0] = "of"
+    >>> words.pop()
+    'chain'
+    >>> words.aggregate("longest"), words.range_aggregate("joined", 0, 1)
+    ('of', List('of'))
+    """
+
+    def __init__(
+        self, contents: Iterable[A] = (), indexed: bool = False, **aggregates: Aggregate[A, Any]
+    ) -> None:
+        self._contents = list(contents)
+        self._aggregates = aggregates
+        self._indexed = indexed
+        if indexed:
+            self._trees = {
+                name: _SegmentTree(agg, list(map(agg.measure, self._contents)))
+                for name, agg in aggregates.items()
+            }
+        else:
+            self._totals = {
+                name: _fold(agg, self._contents) for name, agg in aggregates.items()
+            }
+
+    def append(self, a: A) -> AggregatedList[A]:
+        self._contents.append(a)
+        if self._indexed:
+            for name, agg in self._aggregates.items():
+                self._trees[name].append(agg.measure(a))
+        else:
+            totals = self._totals
+            for name, agg in self._aggregates.items():
+                totals[name] = agg.combine(totals[name], agg.measure(a))
+        return self
+
+    def extend(self, contents: Iterable[A]) -> AggregatedList[A]:
+        for a in contents:
+            self.append(a)
+        return self
+
+    def pop(self) -> A:
+        self._require_index("pop")
+        a = self._contents.pop()
+        for tree in self._trees.values():
+            tree.pop()
+        return a
+
+    def aggregate(self, name: str) -> Any:
+        if self._indexed:
+            return self._trees[name].total()
+        return self._totals[name]
+
+    def range_aggregate(self, name: str, lo: int, hi: int) -> Any:
+        """Folds the aggregate `name` over `self[lo:hi]` only."""
+        self._require_index("range_aggregate")
+        lo, hi, _ = slice(lo, hi).indices(len(self._contents))
+        return self._trees[name].query(lo, max(lo, hi))
+
+    def combine(self, other: List[A]) -> AggregatedList[A]:
+        """Concatenates two lists. Running totals are combined directly when
+        `other` keeps the same aggregate, rather than refolding its elements."""
+        combined = AggregatedList.__new__(AggregatedList)
+        combined._contents = self._contents + list(other)
+        combined._aggregates = self._aggregates
+        combined._indexed = self._indexed
+        if self._indexed:
+            combined._trees = {
+                name: _SegmentTree(agg, self._trees[name].leaves() + list(map(agg.measure, other)))
+                for name, agg in self._aggregates.items()
+            }
+        else:
+            combined._totals = {
+                name: agg.combine(self._totals[name], _cached_or_fold(other, name, agg))
+                for name, agg in self._aggregates.items()
+            }
+        return combined
+
+    def __setitem__(self, i: int, a: A) -> None:
+        """Replaces the element at index `i`, updating every aggregate.
+
+        >>> xs = AggregatedList([1, 2, 3], indexed=True, total=Aggregate.sum())
+        >>> xs[-1] = 10
+        >>> xs[-5] = 100
+        Traceback (most recent call last):
+            ...
+        IndexError: list assignment index out of range
+        >>> xs, xs.aggregate("total"), xs.range_aggregate("total", 0, 2)
+        (AggregatedList(1, 2, 10), 13, 3)
+        """
+        self._require_index("item assignment")
+        n = len(self._contents)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("list assignment index out of range")
+        self._contents[i] = a
+        for name, agg in self._aggregates.items():
+            self._trees[name].set(i, agg.measure(a))
+
+    def __reduce_ex__(self, protocol: int):
+        return _rebuild, (self._contents, self._indexed, self._aggregates)
+
+    def _require_index(self, operation: str) -> None:
+        if not self._indexed:
+            raise TypeError(f"{operation} needs an `AggregatedList` created with `indexed=True`.")
+
+
+def _rebuild(
+    contents: PyList[Any], indexed: bool, aggregates: Dict[str, Aggregate[Any, Any]]
+) -> AggregatedList[Any]:
+    return AggregatedList(contents, indexed, **aggregates)
+
+
+def _fold(agg: Aggregate[Any, M], contents: Iterable[Any]) -> M:
+    total = agg.empty
+    for a in contents:
+        total = agg.combine(total, agg.measure(a))
+    return total
+
+
+def _cached_or_fold(other: List[Any], name: str, agg: Aggregate[Any, M]) -> M:
+    if isinstance(other, AggregatedList) and other._aggregates.get(name) == agg:
+        return other.aggregate(name)
+    return _fold(agg, other)
+
+
+if __name__ == "__main__":
+    # these lines should typecheck
+    a: Monad[int] = AggregatedList([1, 2, 3], total=Aggregate.sum())
+    b: Foldable[int] = a
+    c: Monoid = AggregatedList([1, 2, 3], total=Aggregate.sum())
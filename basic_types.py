@@ -1,10 +1,17 @@
 from __future__ import annotations
+import sys
 from abc import ABC, abstractclassmethod, abstractmethod
+from array import array
 from collections.abc import Iterable
 from functools import reduce
-from typing import Any, Callable, Generic, Iterator, TypeVar
+from itertools import chain
+from pickle import PickleBuffer
+from typing import TYPE_CHECKING, Any, Callable, Generic, Iterator, Optional, Tuple, TypeVar
 from typing_extensions import Protocol
 
+if TYPE_CHECKING:
+    from stream import Stream
+
 from functional_typeclasses import *
 
 A = TypeVar("A")
@@ -56,12 +63,204 @@ class List(Show, Generic[A_co]):
     def foldr(self: List[A_co], fn: Callable[[A_co, Acc], Acc], initial: Acc) -> Acc:
         return reduce(lambda acc, a: fn(a, acc), reversed(self._contents), initial)
 
+    def foldr_lazy(
+        self: List[A_co], fn: Callable[[A_co, Eval[Acc]], Eval[Acc]], initial: Eval[Acc]
+    ) -> Eval[Acc]:
+        """Lazy right fold. `fn` receives the rest of the fold as an `Eval`, and
+        only forces it if it needs to, so folds like `any` can stop early.
+
+        >>> xs = List.of(*range(10 ** 6))
+        >>> xs.foldr_lazy(lambda a, rest: Eval.now(True) if a == 3 else rest,
+        ...               Eval.now(False)).value()
+        True
+        """
+        contents = self._contents
+
+        def go(i: int) -> Eval[Acc]:
+            if i == len(contents):
+                return initial
+            return fn(contents[i], Eval.defer(lambda: go(i + 1)))
+
+        return Eval.defer(lambda: go(0))
+
+    def sort_by(self: List[A_co], key: Callable[[A_co,], Any], max_in_memory: Optional[int] = None) -> Stream[A_co]:
+        """Lazily sorts the list by `key`, computing each key only once. Lists
+        longer than `max_in_memory` are sorted externally; see `external_sort`.
+
+        >>> List.of(3, -1, 2).sort_by(abs).foldl(lambda acc, a: acc + [a], [])
+        [-1, 2, 3]
+        """
+        from external_sort import DEFAULT_MAX_IN_MEMORY, sort_by
+        if max_in_memory is None:
+            max_in_memory = DEFAULT_MAX_IN_MEMORY
+        return sort_by(self, key, max_in_memory)
+
+    def group_by(
+        self: List[A_co], key: Callable[[A_co,], B], max_in_memory: Optional[int] = None
+    ) -> Stream[Tuple[B, List[A_co]]]:
+        """Lazily groups the list's elements by `key`, in order of their keys.
+
+        >>> list(List.of("fold", "map", "chain", "of").group_by(len))
+        [(2, List('of')), (3, List('map')), (4, List('fold')), (5, List('chain'))]
+        """
+        from external_sort import DEFAULT_MAX_IN_MEMORY, group_by
+        if max_in_memory is None:
+            max_in_memory = DEFAULT_MAX_IN_MEMORY
+        return group_by(self, key, max_in_memory)
+
+    def windows(self: List[A_co], size: int, step: int = 1) -> Iterator[ListView[A_co]]:
+        """Iterates over every full window of `size` consecutive elements, moving
+        `step` elements at a time. The windows are views, so nothing is copied.
+
+        >>> [w.foldl(lambda acc, a: acc + a, 0) for w in List.of(1, 2, 3, 4).windows(2)]
+        [3, 5, 7]
+        """
+        if size < 1:
+            raise ValueError(f"size must be at least 1, not {size}.")
+        if step < 1:
+            raise ValueError(f"step must be at least 1, not {step}.")
+        whole = self[:]
+        source, indices = whole._source, whole._indices
+        return (ListView(source, indices[start:start + size]) for start in range(0, len(indices) - size + 1, step))
+
+    def chunks(self: List[A_co], size: int) -> Iterator[ListView[A_co]]:
+        """Iterates over consecutive views of `size` elements. The last chunk
+        may be shorter.
+
+        >>> list(List.of(1, 2, 3, 4, 5).chunks(2))
+        [ListView(1, 2), ListView(3, 4), ListView(5)]
+        """
+        if size < 1:
+            raise ValueError(f"size must be at least 1, not {size}.")
+        whole = self[:]
+        source, indices = whole._source, whole._indices
+        return (ListView(source, indices[start:start + size]) for start in range(0, len(indices), size))
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def __getitem__(self, i):
+        """Indexing returns an element, while slicing returns a `ListView` that
+        shares this list's storage instead of copying it.
+
+        >>> xs = List.of(*range(10))
+        >>> xs[3], xs[-1], xs[2:8:2], xs[2:8:2][1:]
+        (3, 9, ListView(2, 4, 6), ListView(4, 6))
+        """
+        if isinstance(i, slice):
+            return ListView(self._contents, range(len(self._contents))[i])
+        return self._contents[i]
+
     def __iter__(self) -> Iterator[A_co]:
         return iter(self._contents)
     
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(" + ", ".join(map(repr, self._contents)) + ")"
 
+    def __reduce_ex__(self, protocol: int):
+        """Pickles lists of `Option`s or `Result`s wrapping numbers as a tag byte
+        per element plus a packed array of the numbers, instead of one object per
+        element. With protocol 5 the array is handed over as a `PickleBuffer`, so
+        it can be sent out-of-band without being copied. Any other list is
+        pickled as the plain Python list underneath it, which pickle already
+        encodes faster than any packing pass could.
+
+        The numbers are always stored as little-endian ints of 1, 2, 4 or 8 bytes
+        or as 8-byte doubles, so like any other pickle these load on machines
+        with a different byte order or C type sizes.
+
+        >>> import pickle
+        >>> buffers = []
+        >>> data = pickle.dumps(List.of(Some(1), Nothing(), Some(3)), protocol=5,
+        ...                     buffer_callback=buffers.append)
+        >>> len(buffers)
+        1
+        >>> pickle.loads(data, buffers=buffers)
+        List(Some(1), Nothing(), Some(3))
+        """
+        if self.__class__ is not List:
+            return self.__class__, tuple(self._contents)
+        columns = _pack_tagged(self._contents)
+        if columns is not None:
+            tags, packed = columns
+            return _unpack_tagged_list, (tags, _format(packed), _buffer(packed, protocol))
+        return _from_contents, (self._contents,)
+
+class ListView(List, Generic[A_co]):
+    """A read-only window onto (part of) another list's storage, selected by a
+    `range` of indices. Creating, slicing and measuring a view are O(1) and
+    never copy elements; everything else reads straight from the parent.
+    """
+
+    def __init__(self, source: list, indices: range) -> None:
+        self._source = source
+        self._indices = indices
+
+    @property
+    def _contents(self) -> list:
+        # only used by code that needs a real list; views avoid it themselves
+        return list(self)
+
+    def map(self: ListView[A_co], fn: Callable[[A_co,], B]) -> List[B]:
+        return List.of(*map(fn, self))
+
+    def combine(self, other):
+        return List.of(*self, *other)
+
+    def chain(self, fn):
+        return List.of(*(b for sublist in map(fn, self) for b in sublist))
+
+    def foldl(self: ListView[A_co], fn: Callable[[Acc, A_co], Acc], initial: Acc) -> Acc:
+        return reduce(fn, self, initial)
+
+    def foldr(self: ListView[A_co], fn: Callable[[A_co, Acc], Acc], initial: Acc) -> Acc:
+        source = self._source
+        return reduce(lambda acc, i: fn(source[i], acc), reversed(self._indices), initial)
+
+    def foldr_lazy(
+        self: ListView[A_co], fn: Callable[[A_co, Eval[Acc]], Eval[Acc]], initial: Eval[Acc]
+    ) -> Eval[Acc]:
+        source, indices = self._source, self._indices
+
+        def go(i: int) -> Eval[Acc]:
+            if i == len(indices):
+                return initial
+            return fn(source[indices[i]], Eval.defer(lambda: go(i + 1)))
+
+        return Eval.defer(lambda: go(0))
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ListView(self._source, self._indices[i])
+        return self._source[self._indices[i]]
+
+    def __iter__(self) -> Iterator[A_co]:
+        # Walking short shallow slices is much faster in CPython than indexing
+        # one element at a time, and only ever holds _ITER_CHUNK extra pointers.
+        source, indices = self._source, self._indices
+        if len(indices) <= _ITER_CHUNK:
+            return iter(source[_as_slice(indices)])
+        return chain.from_iterable(
+            source[_as_slice(indices[i:i + _ITER_CHUNK])]
+            for i in range(0, len(indices), _ITER_CHUNK)
+        )
+
+    def __reduce_ex__(self, protocol: int):
+        # a view is sent as a copy of just the elements it can see
+        return List(*self).__reduce_ex__(protocol)
+
+_ITER_CHUNK = 4096
+
+def _as_slice(indices: range) -> slice:
+    # a range that runs backwards past index 0 has a negative stop, which a
+    # slice would count from the end instead
+    if not indices:
+        return slice(0, 0)
+    return slice(indices.start, indices.stop if indices.stop >= 0 else None, indices.step)
+
 class Option(ABC, Show, Generic[A]):
     @abstractmethod
     def map(self, fn):
@@ -79,7 +278,14 @@ class Option(ABC, Show, Generic[A]):
     def unwrap(self):
         raise NotImplementedError
 
+    def __reduce_ex__(self, protocol: int):
+        if hasattr(self, "_contents"):
+            return _from_tag, (self._tag, self._contents)
+        return _from_tag, (self._tag,)
+
 class Some(Option, Generic[A]):
+    _tag = 1
+
     def __init__(self, contents):
         self._contents = contents
 
@@ -97,6 +303,8 @@ class Some(Option, Generic[A]):
         return self._contents
 
 class Nothing(Option, Generic[A]):
+    _tag = 0
+
     def map(self, fn):
         return Nothing()
 
@@ -125,8 +333,13 @@ class Result(ABC, Show, Generic[A]):
     @abstractmethod
     def chain(self, fn):
         raise NotImplementedError
+
+    def __reduce_ex__(self, protocol: int):
+        return _from_tag, (self._tag, self._contents)
     
 class Ok(Result, Generic[A]):
+    _tag = 2
+
     def map(self: Ok[A], fn: Callable[[A,], B]) -> Ok[B]:
         return Ok.of(fn(self.unwrap()))
 
@@ -137,6 +350,8 @@ class Ok(Result, Generic[A]):
         return self._contents
 
 class Err(Result, Generic[A]):
+    _tag = 3
+
     def map(self: Err[A], fn: Callable[[A,], B]) -> Err[A]:
         return self
 
@@ -146,6 +361,198 @@ class Err(Result, Generic[A]):
     def unwrap(self: Err[A]) -> A:
         raise Exception(self._contents)
 
+_TAGGED = (Nothing, Some, Ok, Err)
+
+# typecodes for packed ints by size in bytes, since a C int's size varies
+_INT_TYPECODES = {array(typecode).itemsize: typecode for typecode in "bhilq"}
+_BIG_ENDIAN = sys.byteorder == "big"
+
+def _from_tag(tag: int, *contents):
+    return _TAGGED[tag](*contents)
+
+def _pack(values: list) -> Optional[array]:
+    """Packs `values` into an array if they are all floats or all ints that fit
+    in 64 bits, otherwise returns `None`. Ints use the narrowest width that
+    fits them."""
+    kinds = set(map(type, values))
+    if kinds == {float}:
+        return array("d", values)
+    if kinds == {int}:
+        lo, hi = min(values), max(values)
+        for size in (1, 2, 4, 8):
+            bound = 1 << (8 * size - 1)
+            if -bound <= lo and hi < bound:
+                return array(_INT_TYPECODES[size], values)
+    return None
+
+def _pack_tagged(values: list) -> Optional[Tuple[bytes, array]]:
+    """Splits a list of `Option`s and `Result`s into one tag byte per element and
+    a packed array of their numeric contents, with a 0 in place of each `Nothing`."""
+    # check the first element on its own, so other lists are rejected in O(1)
+    if not values or type(values[0]) not in _TAGGED:
+        return None
+    if not all(type(v) in _TAGGED for v in values):
+        return None
+    kinds = {type(v._contents) for v in values if type(v) is not Nothing}
+    placeholder = 0.0 if kinds == {float} else 0
+    packed = _pack([getattr(v, "_contents", placeholder) for v in values])
+    if packed is None:
+        return None
+    return bytes(v._tag for v in values), packed
+
+def _format(packed: array) -> str:
+    # e.g. "i4" or "f8", which means the same on every machine, unlike a typecode
+    return f"{'f' if packed.typecode == 'd' else 'i'}{packed.itemsize}"
+
+def _typecode(fmt: str) -> str:
+    return "d" if fmt == "f8" else _INT_TYPECODES[int(fmt[1:])]
+
+def _buffer(packed: array, protocol: int):
+    if _BIG_ENDIAN:
+        packed = array(packed.typecode, packed)
+        packed.byteswap()
+    return PickleBuffer(packed) if protocol >= 5 else packed.tobytes()
+
+def _from_contents(contents: list) -> List:
+    lst = List.__new__(List)
+    lst._contents = contents
+    return lst
+
+def _unpack_tagged_list(tags: bytes, fmt: str, buffer) -> List:
+    packed = memoryview(buffer).cast("B").cast(_typecode(fmt))
+    if _BIG_ENDIAN:
+        packed = array(packed.format, packed)
+        packed.byteswap()
+    values = packed.tolist()
+    return _from_contents(
+        [Nothing() if tag == 0 else _TAGGED[tag](v) for tag, v in zip(tags, values)]
+    )
+
+
+class Eval(ABC, Show, Generic[A_co]):
+    """A lazy computation producing a value of type `A_co`. `Eval.now` wraps an
+    already computed value, `Eval.later` computes its value the first time it is
+    needed and remembers it, and `Eval.always` recomputes its value every time.
+
+    `map` and `chain` only build up a description of the computation, which
+    `value` then runs on a trampoline, so arbitrarily long chains do not blow
+    the stack.
+
+    >>> calls = []
+    >>> expensive = Eval.later(lambda: calls.append("hi") or 42)
+    >>> calls
+    []
+    >>> expensive.map(lambda x: x + 1).value()
+    43
+    >>> expensive.value()
+    42
+    >>> calls
+    ['hi']
+
+    >>> def count_down(n):
+    ...     return Eval.now(0) if n == 0 else Eval.defer(lambda: count_down(n - 1))
+    >>> count_down(100000).map(lambda x: x + 1).value()
+    1
+    """
+
+    @classmethod
+    def now(cls, value: A) -> Eval[A]:
+        return Now(value)
+
+    @classmethod
+    def later(cls, thunk: Callable[[], A]) -> Eval[A]:
+        return Later(thunk)
+
+    @classmethod
+    def always(cls, thunk: Callable[[], A]) -> Eval[A]:
+        return Always(thunk)
+
+    @classmethod
+    def defer(cls, thunk: Callable[[], Eval[A]]) -> Eval[A]:
+        return _Defer(thunk)
+
+    @classmethod
+    def of(cls, *args: A) -> Eval[A]:
+        return Now(*args)
+
+    def map(self: Eval[A_co], fn: Callable[[A_co,], B]) -> Eval[B]:
+        return _Chain(self, lambda a: Now(fn(a)))
+
+    def chain(self: Eval[A_co], fn: Callable[[A_co,], Eval[B]]) -> Eval[B]:
+        return _Chain(self, fn)
+
+    def memoize(self: Eval[A_co]) -> Eval[A_co]:
+        return _Memo(self)
+
+    def value(self: Eval[A_co]) -> A_co:
+        current: Eval[Any] = self
+        continuations = []
+        while True:
+            # exact type checks, since `isinstance` against an ABC is slow
+            kind = type(current)
+            if kind is _Chain:
+                continuations.append(current._fn)
+                current = current._source
+            elif kind is _Defer:
+                current = current._thunk()
+            elif kind is _Memo and current._source is not None:
+                # evaluated on this trampoline, so memoized evaluations can nest
+                continuations.append(current._store)
+                current = current._source
+            else:
+                result = current._force()
+                if not continuations:
+                    return result
+                current = continuations.pop()(result)
+
+    def _force(self) -> A_co:
+        raise NotImplementedError
+
+class Now(Eval, Generic[A]):
+    def __init__(self, contents: A) -> None:
+        self._contents = contents
+
+    def _force(self) -> A:
+        return self._contents
+
+class Later(Eval, Generic[A]):
+    def __init__(self, thunk: Callable[[], A]) -> None:
+        self._thunk: Optional[Callable[[], A]] = thunk
+
+    def _force(self) -> A:
+        if self._thunk is not None:
+            self._contents = self._thunk()
+            self._thunk = None  # let the closure be garbage collected
+        return self._contents
+
+class Always(Eval, Generic[A]):
+    def __init__(self, thunk: Callable[[], A]) -> None:
+        self._thunk = thunk
+
+    def _force(self) -> A:
+        return self._thunk()
+
+class _Defer(Eval, Generic[A]):
+    def __init__(self, thunk: Callable[[], Eval[A]]) -> None:
+        self._thunk = thunk
+
+class _Chain(Eval, Generic[A]):
+    def __init__(self, source: Eval[Any], fn: Callable[[Any,], Eval[A]]) -> None:
+        self._source = source
+        self._fn = fn
+
+class _Memo(Eval, Generic[A]):
+    def __init__(self, source: Eval[A]) -> None:
+        self._source: Optional[Eval[A]] = source
+
+    def _store(self, value: A) -> _Memo[A]:
+        self._contents = value
+        self._source = None  # let the computation be garbage collected
+        return self
+
+    def _force(self) -> A:
+        return self._contents
+
 
 if __name__ == "__main__":
     # these lines should typecheck
@@ -162,3 +569,6 @@ if __name__ == "__main__":
     m: Unwrappable[str] = Ok.of("This should be unwrappable")
     n: Monad[str] = Err.of(ValueError("Explodes on unwrap!"))
     o: Unwrappable[str] = Err.of(ValueError("Explodes on unwrap!"))
+    p: Monad[int] = Eval.later(lambda: 6 * 7)
+    q: Foldable[int] = List.of(1, 2, 3)
+    r: Foldable[int] = List.of(1, 2, 3)[1:]
@@ -0,0 +1,64 @@
+import io
+import pickle
+import time
+from typing import Any, Callable, List as PyList, Tuple
+
+from basic_types import Err, List, Nothing, Ok, Some
+
+N = 1_000_000
+
+
+class DefaultPickler(pickle.Pickler):
+    """Pickles our containers the way Python would without their custom
+    `__reduce_ex__`, i.e. as full class instances with a `__dict__`."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, (List, Some, Nothing, Ok, Err)):
+            return object.__reduce_ex__(obj, 5)
+        return NotImplemented
+
+
+def default_dumps(obj: Any) -> bytes:
+    f = io.BytesIO()
+    DefaultPickler(f, protocol=5).dump(obj)
+    return f.getvalue()
+
+
+def out_of_band_dumps(obj: Any) -> Tuple[bytes, PyList[pickle.PickleBuffer]]:
+    buffers: PyList[pickle.PickleBuffer] = []
+    return pickle.dumps(obj, protocol=5, buffer_callback=buffers.append), buffers
+
+
+def timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench(name: str, obj: List) -> None:
+    per_million = 1_000_000 / N
+
+    data, dump_time = timed(lambda: default_dumps(obj))
+    _, load_time = timed(lambda: pickle.loads(data))
+    print(f"{name:<12} default       {len(data) * per_million / 2**20:8.2f} MiB"
+          f"  dump {dump_time * per_million:6.3f}s  load {load_time * per_million:6.3f}s")
+
+    data, dump_time = timed(lambda: pickle.dumps(obj, protocol=5))
+    _, load_time = timed(lambda: pickle.loads(data))
+    print(f"{name:<12} in-band       {len(data) * per_million / 2**20:8.2f} MiB"
+          f"  dump {dump_time * per_million:6.3f}s  load {load_time * per_million:6.3f}s")
+
+    (data, buffers), dump_time = timed(lambda: out_of_band_dumps(obj))
+    _, load_time = timed(lambda: pickle.loads(data, buffers=buffers))
+    size = len(data) + sum(buf.raw().nbytes for buf in buffers)
+    print(f"{name:<12} out-of-band   {size * per_million / 2**20:8.2f} MiB"
+          f"  dump {dump_time * per_million:6.3f}s  load {load_time * per_million:6.3f}s")
+
+
+if __name__ == "__main__":
+    print(f"bytes and seconds per million elements (measured on {N} elements)")
+    bench("ints", List.of(*range(N)))
+    bench("floats", List.of(*(i / 3 for i in range(N))))
+    bench("Some/Nothing", List.of(*(Nothing() if i % 10 == 0 else Some(i) for i in range(N))))
+    bench("Ok/Err", List.of(*(Err(-i / 3) if i % 10 == 0 else Ok(i / 3) for i in range(N))))
+    bench("strings", List.of(*map(str, range(N))))
@@ -0,0 +1,46 @@
+import time
+from typing import Any, Callable, Tuple
+
+from basic_types import List
+
+N = 200_000
+WINDOWS = (10, 100, 1000)
+
+
+def timed(fn: Callable[[], Any], repeat: int = 3) -> Tuple[Any, float]:
+    """Returns the result of `fn` and its best time out of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def add(acc: int, a: int) -> int:
+    return acc + a
+
+
+def copied_windows(xs: List[int], size: int, step: int) -> int:
+    """The old way: materialize every window as a new `List`."""
+    contents = list(xs)
+    return sum(
+        List.of(*contents[start:start + size]).foldl(add, 0)
+        for start in range(0, len(contents) - size + 1, step)
+    )
+
+
+def view_windows(xs: List[int], size: int, step: int) -> int:
+    return sum(window.foldl(add, 0) for window in xs.windows(size, step))
+
+
+if __name__ == "__main__":
+    xs = List.of(*range(N))
+    print(f"windowed sums over a List of {N} ints")
+    for size in WINDOWS:
+        step = size // 2
+        copied, copy_time = timed(lambda: copied_windows(xs, size, step))
+        viewed, view_time = timed(lambda: view_windows(xs, size, step))
+        assert copied == viewed
+        print(f"window {size:>5} step {step:>4}  copy {copy_time:6.3f}s  view {view_time:6.3f}s"
+              f"  ({copy_time / view_time:4.2f}x)")
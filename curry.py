@@ -1,5 +1,13 @@
 from __future__ import annotations
-from typing import Callable, Generic, TypeVar, Union
+import functools
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future
+from itertools import islice
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from basic_types import Err, Ok, Result
 
 ReturnType = TypeVar("ReturnType")
 
@@ -103,10 +111,148 @@ class Partial(Generic[ReturnType]):
         else:
             return Partial(self.num_args, self.fn, *all_args, **all_kwargs)
 
+    def apply_many(
+        self,
+        iterable_of_args: Iterable[Tuple[Any, ...]],
+        executor: Optional[Executor] = None,
+        chunksize: int = 1024,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Result[Union[Partial[ReturnType], ReturnType]]]:
+        """Calls this partial application once for every tuple of positional
+        arguments in `iterable_of_args`, and lazily yields the results in order.
+        This is equivalent to `self(*args)` for each `args`, but the arguments
+        bound so far are only merged once rather than on every call.
+
+        Every result is wrapped in an `Ok`, unless the call raised, in which case
+        the exception is wrapped in an `Err` and the remaining calls still go
+        ahead. Just like calling it directly, too few arguments give a `Partial`.
+
+        >>> @curry(num_args=3)
+        ... def scale(factor, offset, x):
+        ...     return factor * x + offset
+        >>> list(scale(2, 1).apply_many([(1,), (2,), (3,)]))
+        [Ok(3), Ok(5), Ok(7)]
+        >>> list(scale(2).apply_many([(0, 1), (None, 1)]))
+        [Ok(2), Err(TypeError("unsupported operand type(s) for +: 'int' and 'NoneType'"))]
+
+        If `executor` is given, the arguments are split into chunks of
+        `chunksize` calls which are run on it, with at most `max_in_flight`
+        chunks submitted but not yet yielded at once. It defaults to twice the
+        number of CPUs, i.e. two chunks per worker for a default-sized pool; pass
+        it explicitly when the executor has a different number of workers.
+        Process pools work as long as the curried function is defined at the top
+        level of a module.
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> with ThreadPoolExecutor(4) as pool:
+        ...     results = scale(10, 0).apply_many(((x,) for x in range(1000)), pool, 64, max_in_flight=8)
+        ...     sum(result.unwrap() for result in results)
+        4995000
+
+        Parameters
+        ----------
+        iterable_of_args    tuples of positional arguments, one per call
+        executor            optional `concurrent.futures.Executor` to run the calls on
+        chunksize           number of calls sent to the executor at once
+        max_in_flight       maximum number of chunks submitted to the executor at once
+
+        Returns
+        -------
+        an iterator over the `Ok` or `Err` result of each call, in order
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1, not {chunksize}.")
+        if max_in_flight is None:
+            max_in_flight = 2 * (os.cpu_count() or 1)
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, not {max_in_flight}.")
+        if executor is None:
+            return _apply_each(self, iterable_of_args)
+        return _apply_chunks(self, iter(iterable_of_args), executor, chunksize, max_in_flight)
+
+    def __reduce__(self):
+        # A curried function's module attribute is the `Partial` made by the
+        # decorator rather than the function itself, so `fn` can't be pickled by
+        # reference. Refer to it through that `Partial` instead.
+        fn = self.fn
+        decorated = _lookup(getattr(fn, "__module__", None), getattr(fn, "__qualname__", ""))
+        if isinstance(decorated, Partial) and decorated.fn is fn:
+            return _curried, (fn.__module__, fn.__qualname__, self.args, self.kwargs)
+        return _partial, (self.num_args, fn, self.args, self.kwargs)
+
     def __repr__(self):
         return f"Partial({self.fn}, args={self.args}, kwargs={self.kwargs})"
 
 
+def _apply_each(partial: Partial[ReturnType], args: Iterable[Tuple[Any, ...]]) -> Iterator[Result[Any]]:
+    bound = functools.partial(partial.fn, *partial.args, **partial.kwargs)
+    needed = partial.num_args - len(partial.args) - len(partial.kwargs)
+    for a in args:
+        try:
+            yield Ok(bound(*a) if len(a) >= needed else partial(*a))
+        except Exception as e:
+            yield Err(e)
+
+
+def _apply_chunk(partial: Partial[ReturnType], chunk: Iterable[Tuple[Any, ...]]) -> List[Result[Any]]:
+    return list(_apply_each(partial, chunk))
+
+
+def _apply_chunks(
+    partial: Partial[ReturnType],
+    args: Iterator[Tuple[Any, ...]],
+    executor: Executor,
+    chunksize: int,
+    max_in_flight: int,
+) -> Iterator[Result[Any]]:
+    in_flight: deque = deque()
+    for chunk in iter(lambda: list(islice(args, chunksize)), []):
+        in_flight.append((chunk, _submit_chunk(executor, partial, chunk)))
+        if len(in_flight) >= max_in_flight:
+            yield from _chunk_results(executor, partial, *in_flight.popleft())
+    while in_flight:
+        yield from _chunk_results(executor, partial, *in_flight.popleft())
+
+
+def _submit_chunk(executor: Executor, partial: Partial[ReturnType], chunk: List[Tuple[Any, ...]]) -> Future:
+    try:
+        return executor.submit(_apply_chunk, partial, chunk)
+    except Exception as e:  # e.g. the executor has been shut down
+        future: Future = Future()
+        future.set_exception(e)
+        return future
+
+
+def _chunk_results(
+    executor: Executor, partial: Partial[ReturnType], chunk: List[Tuple[Any, ...]], future: Future
+) -> List[Result[Any]]:
+    try:
+        return future.result()
+    except Exception as e:
+        if len(chunk) == 1:
+            return [Err(e)]
+    # e.g. one of the arguments couldn't be sent to a worker process: retry the
+    # calls one at a time, so that only the ones which fail become `Err`s
+    singles = [(args, _submit_chunk(executor, partial, [args])) for args in chunk]
+    return [_chunk_results(executor, partial, [args], single)[0] for args, single in singles]
+
+
+def _lookup(module: Optional[str], qualname: str) -> Any:
+    obj: Any = sys.modules.get(module) if module else None
+    for name in qualname.split("."):
+        obj = getattr(obj, name, None)
+    return obj
+
+
+def _curried(module: str, qualname: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Partial[Any]:
+    decorated = _lookup(module, qualname)
+    return Partial(decorated.num_args, decorated.fn, *args, **kwargs)
+
+
+def _partial(num_args: int, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Partial[Any]:
+    return Partial(num_args, fn, *args, **kwargs)
+
+
 def curry_functional(num_args: int):
     """Curries the decorated function. Instead of having to provide all arguments
     at once, they can be provided one or a few at a time. Once at least `num_args`
@@ -0,0 +1,131 @@
+from __future__ import annotations
+import heapq
+import os
+import pickle
+import tempfile
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List as PyList, Optional, Tuple, TypeVar
+
+from basic_types import List
+from stream import Stream
+
+A = TypeVar("A")
+K = TypeVar("K")
+
+DEFAULT_MAX_IN_MEMORY = 100_000
+_MAX_FAN_IN = 64
+_BATCH = 1024
+
+Record = Tuple[Any, int, Any]  # (key, original position, element)
+
+
+def sort_by(
+    iterable: Iterable[A],
+    key: Callable[[A], Any],
+    max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    tmpdir: Optional[str] = None,
+) -> Stream[A]:
+    """Stably sorts `iterable` by `key`, calling `key` exactly once per element.
+    If there are more than `max_in_memory` elements, they are sorted in runs of
+    that size which are spilled to temporary files in `tmpdir` and then merged,
+    so memory use stays bounded by `max_in_memory` rather than the input size.
+    The temporary files are removed once the result has been consumed (or
+    garbage collected).
+
+    >>> words = ["banana", "fig", "apple", "kiwi", "cherry", "date"]
+    >>> list(sort_by(words, len, max_in_memory=2))
+    ['fig', 'kiwi', 'date', 'apple', 'banana', 'cherry']
+    """
+    return Stream.from_iterable(map(itemgetter(2), _sorted_records(iterable, key, max_in_memory, tmpdir)))
+
+
+def group_by(
+    iterable: Iterable[A],
+    key: Callable[[A], K],
+    max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    tmpdir: Optional[str] = None,
+) -> Stream[Tuple[K, List[A]]]:
+    """Groups the elements of `iterable` with equal keys, in order of their key,
+    using `sort_by`. Each group keeps its elements in their original order and
+    has to fit in memory, but the input as a whole does not.
+
+    >>> list(group_by(["banana", "fig", "apple", "kiwi", "cherry", "date"], len, 2))
+    [(3, List('fig')), (4, List('kiwi', 'date')), (5, List('apple')), (6, List('banana', 'cherry'))]
+    """
+    records = _sorted_records(iterable, key, max_in_memory, tmpdir)
+    return Stream.from_iterable(
+        (k, List.of(*map(itemgetter(2), group))) for k, group in groupby(records, itemgetter(0))
+    )
+
+
+def _sorted_records(
+    iterable: Iterable[Any], key: Callable[[Any], Any], max_in_memory: int, tmpdir: Optional[str]
+) -> Iterator[Record]:
+    if max_in_memory < 1:
+        raise ValueError(f"max_in_memory must be at least 1, not {max_in_memory}.")
+    # nothing is keyed or sorted until the first record is asked for, whatever
+    # the size of the input
+    return _sort(iterable, key, max_in_memory, tmpdir)
+
+
+def _sort(
+    iterable: Iterable[Any], key: Callable[[Any], Any], max_in_memory: int, tmpdir: Optional[str]
+) -> Iterator[Record]:
+    # The position breaks ties, which keeps the sort stable and means the
+    # elements themselves never have to be comparable.
+    records = ((key(a), i, a) for i, a in enumerate(iterable))
+    first = sorted(islice(records, max_in_memory))
+    if len(first) < max_in_memory:
+        yield from first
+        return
+    runs = [_spill(first, tmpdir)]
+    del first
+    yield from _merge_spilled(runs, records, max_in_memory, tmpdir)
+
+
+def _merge_spilled(
+    runs: PyList[str], records: Iterator[Record], max_in_memory: int, tmpdir: Optional[str]
+) -> Iterator[Record]:
+    try:
+        while True:
+            run = sorted(islice(records, max_in_memory))
+            if not run:
+                break
+            runs.append(_spill(run, tmpdir))
+        while len(runs) > _MAX_FAN_IN:
+            # merge in several passes rather than keeping too many files open
+            group = runs[:_MAX_FAN_IN]
+            merged = _spill(heapq.merge(*map(_read_run, group)), tmpdir)
+            # only forget about the group's files once they have been merged
+            runs = runs[_MAX_FAN_IN:] + [merged]
+            for path in group:
+                os.remove(path)
+        yield from heapq.merge(*map(_read_run, runs))
+    finally:
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _spill(records: Iterable[Record], tmpdir: Optional[str]) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            iterator = iter(records)
+            for batch in iter(lambda: list(islice(iterator, _BATCH)), []):
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _read_run(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
@@ -2,9 +2,12 @@ from __future__ import annotations
 from abc import ABC, abstractclassmethod, abstractmethod
 from collections.abc import Iterable
 from functools import reduce
-from typing import Any, Callable, Generic, Iterator, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Generic, Iterator, TypeVar
 from typing_extensions import Protocol
 
+if TYPE_CHECKING:
+    from basic_types import Eval
+
 __all__ = [
     "Foldable",
     "Functor",
@@ -47,6 +50,11 @@ class Foldable(Functor, Protocol, Generic[A_co]):
     def foldr(self: Foldable[A_co], fn: Callable[[A_co, Acc], Acc], initial: Acc) -> Acc:
         ...
 
+    def foldr_lazy(
+        self: Foldable[A_co], fn: Callable[[A_co, Eval[Acc]], Eval[Acc]], initial: Eval[Acc]
+    ) -> Eval[Acc]:
+        ...
+
 class Unwrappable(Protocol, Generic[A_co]):
     def unwrap(self: Unwrappable[A_co]) -> A_co:
         ...
@@ -0,0 +1,378 @@
+from __future__ import annotations
+from typing import Any, Callable, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from basic_types import Nothing, Option, Some
+from functional_typeclasses import *
+
+K = TypeVar("K")
+V = TypeVar("V")
+W = TypeVar("W")
+Acc = TypeVar("Acc")
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _bit(h: int, shift: int) -> int:
+    return 1 << ((h >> shift) & _MASK)
+
+
+def _index(bitmap: int, bit: int) -> int:
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+class _BitmapNode:
+    """An inner trie node. `bitmap` says which of the 32 possible children are
+    present, and `entries` holds them in order, each either a `(key, value)`
+    pair or another node. `edit` is the transient that owns this node and may
+    therefore change it in place, or `None` if nothing may."""
+
+    def __init__(self, bitmap: int, entries: List[Any], edit: Optional[object]) -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+        self.edit = edit
+
+    def _editable(self, edit: Optional[object]) -> _BitmapNode:
+        if edit is not None and self.edit is edit:
+            return self
+        return _BitmapNode(self.bitmap, list(self.entries), edit)
+
+    def get(self, shift: int, h: int, key: Any, default: Any) -> Any:
+        bit = _bit(h, shift)
+        if not self.bitmap & bit:
+            return default
+        entry = self.entries[_index(self.bitmap, bit)]
+        if isinstance(entry, tuple):
+            return entry[1] if entry[0] == key else default
+        return entry.get(shift + _BITS, h, key, default)
+
+    def assoc(
+        self, shift: int, h: int, key: Any, value: Any, edit: Optional[object], added: List[bool]
+    ) -> _BitmapNode:
+        bit = _bit(h, shift)
+        idx = _index(self.bitmap, bit)
+        if not self.bitmap & bit:
+            node = self._editable(edit)
+            node.bitmap |= bit
+            node.entries.insert(idx, (key, value))
+            added[0] = True
+            return node
+        entry = self.entries[idx]
+        if isinstance(entry, tuple):
+            old_key, old_value = entry
+            if old_key == key:
+                if old_value is value:
+                    return self
+                new_entry: Any = (key, value)
+            else:
+                new_entry = _make_node(shift + _BITS, old_key, old_value, h, key, value, edit)
+                added[0] = True
+        else:
+            new_entry = entry.assoc(shift + _BITS, h, key, value, edit, added)
+            if new_entry is entry:
+                return self
+        node = self._editable(edit)
+        node.entries[idx] = new_entry
+        return node
+
+    def dissoc(
+        self, shift: int, h: int, key: Any, edit: Optional[object], removed: List[bool]
+    ) -> Optional[_BitmapNode]:
+        bit = _bit(h, shift)
+        if not self.bitmap & bit:
+            return self
+        idx = _index(self.bitmap, bit)
+        entry = self.entries[idx]
+        if isinstance(entry, tuple):
+            if entry[0] != key:
+                return self
+            new_entry = None
+            removed[0] = True
+        else:
+            new_entry = entry.dissoc(shift + _BITS, h, key, edit, removed)
+            if new_entry is entry:
+                return self
+        if new_entry is None:
+            if self.bitmap == bit:
+                return None
+            node = self._editable(edit)
+            node.bitmap ^= bit
+            del node.entries[idx]
+            return node
+        node = self._editable(edit)
+        node.entries[idx] = new_entry
+        return node
+
+    def map_values(self, fn: Callable[[Any], Any]) -> _BitmapNode:
+        return _BitmapNode(
+            self.bitmap,
+            [
+                (entry[0], fn(entry[1])) if isinstance(entry, tuple) else entry.map_values(fn)
+                for entry in self.entries
+            ],
+            None,
+        )
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        for entry in self.entries:
+            if isinstance(entry, tuple):
+                yield entry
+            else:
+                yield from entry.items()
+
+
+class _CollisionNode:
+    """A leaf holding several keys whose full hashes are equal."""
+
+    def __init__(self, h: int, pairs: List[Tuple[Any, Any]], edit: Optional[object]) -> None:
+        self.hash = h
+        self.pairs = pairs
+        self.edit = edit
+
+    def _editable(self, edit: Optional[object]) -> _CollisionNode:
+        if edit is not None and self.edit is edit:
+            return self
+        return _CollisionNode(self.hash, list(self.pairs), edit)
+
+    def _find(self, key: Any) -> int:
+        for i, (k, _) in enumerate(self.pairs):
+            if k == key:
+                return i
+        return -1
+
+    def get(self, shift: int, h: int, key: Any, default: Any) -> Any:
+        i = self._find(key)
+        return default if i < 0 else self.pairs[i][1]
+
+    def assoc(
+        self, shift: int, h: int, key: Any, value: Any, edit: Optional[object], added: List[bool]
+    ) -> Any:
+        if h != self.hash:
+            parent = _BitmapNode(_bit(self.hash, shift), [self], edit)
+            return parent.assoc(shift, h, key, value, edit, added)
+        i = self._find(key)
+        if i >= 0 and self.pairs[i][1] is value:
+            return self
+        node = self._editable(edit)
+        if i < 0:
+            node.pairs.append((key, value))
+            added[0] = True
+        else:
+            node.pairs[i] = (key, value)
+        return node
+
+    def dissoc(
+        self, shift: int, h: int, key: Any, edit: Optional[object], removed: List[bool]
+    ) -> Any:
+        i = self._find(key)
+        if i < 0:
+            return self
+        removed[0] = True
+        if len(self.pairs) == 2:
+            return self.pairs[1 - i]
+        node = self._editable(edit)
+        del node.pairs[i]
+        return node
+
+    def map_values(self, fn: Callable[[Any], Any]) -> _CollisionNode:
+        return _CollisionNode(self.hash, [(k, fn(v)) for k, v in self.pairs], None)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return iter(self.pairs)
+
+
+def _make_node(
+    shift: int, key1: Any, value1: Any, h2: int, key2: Any, value2: Any, edit: Optional[object]
+) -> Any:
+    h1 = _hash(key1)
+    if h1 == h2:
+        return _CollisionNode(h1, [(key1, value1), (key2, value2)], edit)
+    added = [False]
+    node = _BitmapNode(0, [], edit)
+    node = node.assoc(shift, h1, key1, value1, edit, added)
+    return node.assoc(shift, h2, key2, value2, edit, added)
+
+
+_EMPTY_ROOT = _BitmapNode(0, [], None)
+_MISSING = object()
+
+
+class Map(Show, Generic[K, V]):
+    """An immutable hash map, implemented as a hash array mapped trie. `assoc`
+    and `dissoc` return a new `Map` in O(log32 n) time, sharing all untouched
+    parts of the trie with the original.
+
+    `combine` merges two maps, combining the values of keys present in both
+    with the values' own `combine`, so maps of monoids form a monoid too. This
+    makes keyed aggregation a plain fold:
+
+    >>> from basic_types import List
+    >>> words = List.of("fold", "map", "chain", "of", "foldr")
+    >>> by_length = words.map(lambda w: Map.empty().assoc(len(w), List.of(w))).foldl(
+    ...     Map.combine, Map.empty())
+    >>> by_length[4], by_length[5]
+    (List('fold'), List('chain', 'foldr'))
+    >>> by_length.get(3), by_length.get(7)
+    (Some(List('map')), Nothing())
+
+    Bulk loads should go through a `TransientMap`, which updates its nodes in
+    place until `persistent` is called.
+
+    >>> squares = Map.from_items((n, n * n) for n in range(1000))
+    >>> len(squares), squares[12], len(squares.dissoc(12)), 12 in squares
+    (1000, 144, 999, True)
+    """
+
+    def __init__(self, _root: Any = _EMPTY_ROOT, _count: int = 0) -> None:
+        self._root = _root
+        self._count = _count
+
+    @classmethod
+    def empty(cls) -> Map[K, V]:
+        return Map()
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[K, V]]) -> Map[K, V]:
+        transient: TransientMap[K, V] = Map.empty().transient()
+        for key, value in items:
+            transient.assoc(key, value)
+        return transient.persistent()
+
+    def assoc(self, key: K, value: V) -> Map[K, V]:
+        added = [False]
+        root = self._root.assoc(0, _hash(key), key, value, None, added)
+        if root is self._root:
+            return self
+        return Map(root, self._count + added[0])
+
+    def dissoc(self, key: K) -> Map[K, V]:
+        removed = [False]
+        root = self._root.dissoc(0, _hash(key), key, None, removed)
+        if not removed[0]:
+            return self
+        return Map(_as_root(root), self._count - 1)
+
+    def get(self, key: K) -> Option[V]:
+        value = self._root.get(0, _hash(key), key, _MISSING)
+        return Nothing() if value is _MISSING else Some(value)
+
+    def map(self, fn: Callable[[V,], W]) -> Map[K, W]:
+        return Map(self._root.map_values(fn), self._count)
+
+    def combine(self, other: Map[K, V]) -> Map[K, V]:
+        if len(self) >= len(other):
+            transient = self.transient()
+            for key, value in other.items():
+                mine = transient._get(key)
+                transient.assoc(key, value if mine is _MISSING else mine.combine(value))
+        else:
+            transient = other.transient()
+            for key, value in self.items():
+                theirs = transient._get(key)
+                transient.assoc(key, value if theirs is _MISSING else value.combine(theirs))
+        return transient.persistent()
+
+    def foldl(self, fn: Callable[[Acc, V], Acc], initial: Acc) -> Acc:
+        for _, value in self.items():
+            initial = fn(initial, value)
+        return initial
+
+    def transient(self) -> TransientMap[K, V]:
+        return TransientMap(self._root, self._count)
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return self._root.items()
+
+    def keys(self) -> Iterator[K]:
+        return (key for key, _ in self.items())
+
+    def values(self) -> Iterator[V]:
+        return (value for _, value in self.items())
+
+    def __getitem__(self, key: K) -> V:
+        value = self._root.get(0, _hash(key), key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return self._root.get(0, _hash(key), key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[K]:
+        return self.keys()
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Map) or len(self) != len(other):
+            return False
+        return all(
+            other._root.get(0, _hash(key), key, _MISSING) == value
+            for key, value in self.items()
+        )
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{key!r}: {value!r}" for key, value in self.items())
+        return f"{self.__class__.__name__}({{{items}}})"
+
+
+class TransientMap(Generic[K, V]):
+    """A mutable builder for a `Map`. It starts out sharing all of its nodes with
+    the map it was made from, and copies each node at most once before changing
+    it in place. Once `persistent` has been called it can no longer be used."""
+
+    def __init__(self, root: Any, count: int) -> None:
+        self._root = root
+        self._count = count
+        self._edit: Optional[object] = object()
+
+    def _check(self) -> object:
+        if self._edit is None:
+            raise TypeError("Cannot use a `TransientMap` after calling `persistent()` on it.")
+        return self._edit
+
+    def _get(self, key: K) -> Any:
+        return self._root.get(0, _hash(key), key, _MISSING)
+
+    def assoc(self, key: K, value: V) -> TransientMap[K, V]:
+        added = [False]
+        self._root = self._root.assoc(0, _hash(key), key, value, self._check(), added)
+        self._count += added[0]
+        return self
+
+    def dissoc(self, key: K) -> TransientMap[K, V]:
+        removed = [False]
+        root = self._root.dissoc(0, _hash(key), key, self._check(), removed)
+        self._root = _as_root(root)
+        self._count -= removed[0]
+        return self
+
+    def persistent(self) -> Map[K, V]:
+        self._check()
+        self._edit = None
+        return Map(self._root, self._count)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def _as_root(node: Any) -> Any:
+    # dissoc may leave nothing, or a single pair lifted out of a collision node
+    if node is None:
+        return _EMPTY_ROOT
+    if isinstance(node, tuple):
+        added = [False]
+        return _EMPTY_ROOT.assoc(0, _hash(node[0]), node[0], node[1], None, added)
+    return node
+
+
+if __name__ == "__main__":
+    # these lines should typecheck
+    a: Functor[int] = Map.empty().assoc("a", 1)
+    b: Monoid = Map.empty()
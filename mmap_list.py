@@ -0,0 +1,181 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import tempfile
+import weakref
+from functools import reduce
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+from basic_types import Eval
+from functional_typeclasses import *
+
+A = TypeVar("A")
+A_co = TypeVar("A_co", covariant=True)
+B = TypeVar("B")
+Acc = TypeVar("Acc")
+
+_WRITE_BATCH = 4096
+
+
+class MmapList(Show, Generic[A_co]):
+    """A read-only list backed by a file of fixed-width records, each described
+    by the `struct` format `fmt`. The file is memory-mapped rather than read, so
+    lists larger than RAM can be folded over and the OS page cache decides what
+    stays in memory. Single-field formats give scalars, others give tuples.
+
+    `map` does not build its result in memory either: it writes it record by
+    record into a new file (a temporary one unless `path` is given), which is
+    deleted again once the resulting `MmapList` is closed or garbage collected.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "squares.bin")
+    >>> squares = MmapList.from_iterable(path, "<q", (n * n for n in range(5)))
+    >>> list(squares)
+    [0, 1, 4, 9, 16]
+    >>> halves = squares.map(lambda n: n / 2, fmt="<d")
+    >>> halves.foldl(lambda acc, x: acc + x, 0.0)
+    15.0
+    >>> squares.foldr(lambda x, acc: acc + [x], [])
+    [16, 9, 4, 1, 0]
+    >>> len(squares), squares[2]
+    (5, 4)
+    >>> halves.close(); squares.close()
+    """
+
+    def __init__(self, path: str, fmt: str, _owned: bool = False) -> None:
+        self._path = path
+        self._struct = struct.Struct(fmt)
+        self._single = _is_single(self._struct)
+        size = os.path.getsize(path)
+        if size % self._struct.size != 0:
+            raise ValueError(
+                f"{path} is {size} bytes long, which is not a whole number of "
+                f"{self._struct.size} byte records."
+            )
+        self._length = size // self._struct.size
+        if size == 0:
+            self._mmap: Optional[mmap.mmap] = None  # empty files can't be mapped
+        else:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._finalizer = weakref.finalize(
+            self, _release, self._mmap, path if _owned else None
+        )
+
+    @classmethod
+    def from_iterable(cls, path: Optional[str], fmt: str, iterable: Iterable[Any]) -> MmapList:
+        """Writes the records in `iterable` to `path` and maps the result. If
+        `path` is `None`, a temporary file is used."""
+        owned = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".bin")
+            os.close(fd)
+        packer = struct.Struct(fmt)
+        pack = packer.pack if _is_single(packer) else (lambda record: packer.pack(*record))
+        iterator = iter(iterable)
+        try:
+            with open(path, "wb") as f:
+                while True:
+                    batch = b"".join(map(pack, islice(iterator, _WRITE_BATCH)))
+                    if not batch:
+                        break
+                    f.write(batch)
+        except BaseException:
+            if owned:
+                os.remove(path)
+            raise
+        return MmapList(path, fmt, _owned=owned)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def format(self) -> str:
+        return self._struct.format
+
+    def map(
+        self: MmapList[A_co],
+        fn: Callable[[A_co,], B],
+        fmt: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> MmapList[B]:
+        return MmapList.from_iterable(path, fmt or self.format, map(fn, self))
+
+    def foldl(self: MmapList[A_co], fn: Callable[[Acc, A_co], Acc], initial: Acc) -> Acc:
+        return reduce(fn, self, initial)
+
+    def foldr(self: MmapList[A_co], fn: Callable[[A_co, Acc], Acc], initial: Acc) -> Acc:
+        # read the records back to front instead of materializing a reversed copy
+        return reduce(
+            lambda acc, i: fn(self[i], acc), range(self._length - 1, -1, -1), initial
+        )
+
+    def foldr_lazy(
+        self: MmapList[A_co], fn: Callable[[A_co, Eval[Acc]], Eval[Acc]], initial: Eval[Acc]
+    ) -> Eval[Acc]:
+        def go(i: int) -> Eval[Acc]:
+            if i == self._length:
+                return initial
+            return fn(self[i], Eval.defer(lambda: go(i + 1)))
+
+        return Eval.defer(lambda: go(0))
+
+    def close(self) -> None:
+        """Unmaps the file, and deletes it if it was a temporary one."""
+        self._finalizer()
+
+    def __enter__(self) -> MmapList[A_co]:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> A_co:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("MmapList index out of range")
+        record = self._struct.unpack_from(self._mmap, i * self._struct.size)
+        return record[0] if self._single else record
+
+    def __iter__(self) -> Iterator[A_co]:
+        # a generator, so that `self` (and with it the mapping and any temporary
+        # file) stays alive for as long as someone is iterating over it
+        if self._mmap is None:
+            return
+        records = self._struct.iter_unpack(self._mmap)
+        yield from map(itemgetter(0), records) if self._single else records
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._path!r}, {self.format!r}, length={self._length})"
+
+
+def _is_single(packer: struct.Struct) -> bool:
+    return len(packer.unpack(bytes(packer.size))) == 1
+
+
+def _release(mapped: Optional[mmap.mmap], owned_path: Optional[str]) -> None:
+    try:
+        if mapped is not None:
+            mapped.close()
+    except BufferError:
+        # an iterator still reads from the mapping; it is unmapped once that
+        # iterator is gone, and the file can be removed in the meantime
+        pass
+    finally:
+        if owned_path is not None:
+            os.remove(owned_path)
+
+
+if __name__ == "__main__":
+    # these lines should typecheck
+    with MmapList.from_iterable(None, "d", [1.0, 2.0]) as a:
+        b: Functor[float] = a
+        c: Foldable[float] = a
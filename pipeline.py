@@ -0,0 +1,327 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterable, Iterator, Tuple, TypeVar
+
+from basic_types import List
+from fio import IO
+from functional_typeclasses import *
+
+A = TypeVar("A")
+A_co = TypeVar("A_co", covariant=True)
+B = TypeVar("B")
+Acc = TypeVar("Acc")
+
+_DONE = object()
+_POLL_SECONDS = 0.05
+
+
+class _Cancelled(Exception):
+    pass
+
+
+@dataclass
+class StageMetrics:
+    """What a single stage did during the last run of a pipeline. `busy_seconds`
+    adds up the time spent inside the stage's function across all its workers,
+    and the queue depths are sampled from the stage's input queue every time an
+    item is taken off it: a stage whose input queue is usually full is the
+    bottleneck, one whose input queue is usually empty is waiting on upstream."""
+
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    max_queue_depth: int = 0
+    _depth_total: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Items produced per second of wall-clock time."""
+        return self.items_out / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def mean_queue_depth(self) -> float:
+        return self._depth_total / self.items_in if self.items_in else 0.0
+
+    def _sample(self, q: queue.Queue) -> None:
+        depth = q.qsize()
+        self.items_in += 1
+        self._depth_total += depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def __repr__(self) -> str:
+        return (
+            f"StageMetrics({self.name!r}, workers={self.workers}, in={self.items_in}, "
+            f"out={self.items_out}, {self.throughput:.0f}/s, busy={self.busy_seconds:.3f}s, "
+            f"queue depth mean={self.mean_queue_depth:.1f} max={self.max_queue_depth})"
+        )
+
+
+@dataclass(frozen=True)
+class _Stage:
+    name: str
+    kind: str  # "map", "chain" or "filter"
+    fn: Callable[[Any], Any]
+    workers: int
+    processes: bool
+
+
+class Pipeline(Generic[A_co]):
+    """A streaming pipeline from a source, through a sequence of `map`, `chain`
+    and `filter` stages, into a sink. Every stage runs concurrently with the
+    others in its own thread, and consecutive stages are connected by queues
+    holding at most `maxsize` items, so a slow stage makes the ones before it
+    wait rather than letting data pile up in memory.
+
+    A stage with `workers > 1` runs its function on a thread pool, or on a
+    process pool if `processes=True` (which then needs a picklable function).
+    Items always come out in the order they went in.
+
+    Building a pipeline does nothing; it runs when a sink (`foldl`, `to_list`,
+    `to_file` or `foreach`) is called, after which `metrics()` describes what
+    each stage did.
+
+    >>> p = (Pipeline.from_iterable(range(10))
+    ...      .filter(lambda n: n % 2 == 0)
+    ...      .map(lambda n: n * n, workers=4)
+    ...      .chain(lambda n: [n, -n]))
+    >>> p.to_list()
+    List(0, 0, 4, -4, 16, -16, 36, -36, 64, -64)
+    >>> [(m.name, m.items_in, m.items_out) for m in p.metrics()]
+    [('source', 10, 10), ('filter', 10, 5), ('map', 5, 5), ('chain', 5, 10)]
+    """
+
+    def __init__(
+        self, source: Callable[[], Iterable[A_co]], stages: Tuple[_Stage, ...] = (), maxsize: int = 64
+    ) -> None:
+        self._source = source
+        self._stages = stages
+        self._maxsize = maxsize
+        self._metrics: List[StageMetrics] = List.empty()
+
+    @classmethod
+    def from_iterable(cls, iterable: Iterable[A], maxsize: int = 64) -> Pipeline[A]:
+        return Pipeline(lambda: iterable, maxsize=maxsize)
+
+    @classmethod
+    def of(cls, *args: A) -> Pipeline[A]:
+        return Pipeline.from_iterable(args)
+
+    @classmethod
+    def from_file(cls, fname: str, maxsize: int = 64) -> Pipeline[str]:
+        """Streams the lines of `fname`, instead of reading it all at once like
+        `fio.readFile`."""
+
+        def lines() -> Iterator[str]:
+            with open(fname, "r") as f:
+                yield from f
+
+        return Pipeline(lines, maxsize=maxsize)
+
+    def map(
+        self: Pipeline[A_co], fn: Callable[[A_co,], B], workers: int = 1, processes: bool = False
+    ) -> Pipeline[B]:
+        return self._then(_Stage("map", "map", fn, workers, processes))
+
+    def chain(
+        self: Pipeline[A_co],
+        fn: Callable[[A_co,], Iterable[B]],
+        workers: int = 1,
+        processes: bool = False,
+    ) -> Pipeline[B]:
+        return self._then(_Stage("chain", "chain", fn, workers, processes))
+
+    def filter(
+        self: Pipeline[A_co], pred: Callable[[A_co,], bool], workers: int = 1, processes: bool = False
+    ) -> Pipeline[A_co]:
+        return self._then(_Stage("filter", "filter", pred, workers, processes))
+
+    def foldl(self: Pipeline[A_co], fn: Callable[[Acc, A_co], Acc], initial: Acc) -> Acc:
+        for a in self._run():
+            initial = fn(initial, a)
+        return initial
+
+    def to_list(self: Pipeline[A_co]) -> List[A_co]:
+        return List.of(*self._run())
+
+    def to_file(self: Pipeline[str], fname: str) -> IO[None]:
+        """Writes every item to `fname` as it arrives, like `fio.writeFile`
+        would write them all at once."""
+        with open(fname, "w") as f:
+            for s in self._run():
+                f.write(s)
+        return IO.of(None)
+
+    def foreach(self: Pipeline[A_co], fn: Callable[[A_co,], IO[Any]]) -> IO[None]:
+        for a in self._run():
+            fn(a)
+        return IO.of(None)
+
+    def metrics(self) -> List[StageMetrics]:
+        """Per-stage metrics of the last run, starting with the source."""
+        return self._metrics
+
+    def _then(self, stage: _Stage) -> Pipeline[Any]:
+        return Pipeline(self._source, self._stages + (stage,), self._maxsize)
+
+    def _run(self) -> Iterator[A_co]:
+        cancel = threading.Event()
+        errors: list = []
+        queues = [queue.Queue(self._maxsize) for _ in range(len(self._stages) + 1)]
+        source_metrics = StageMetrics("source", 1)
+        stage_metrics = [StageMetrics(stage.name, stage.workers) for stage in self._stages]
+        self._metrics = List.of(source_metrics, *stage_metrics)
+        executors: list = []
+        threads = [_spawn(_feed_source, errors, cancel, self._source, queues[0], source_metrics, cancel)]
+        for stage, metrics, in_q, out_q in zip(self._stages, stage_metrics, queues, queues[1:]):
+            if stage.workers == 1 and not stage.processes:
+                threads.append(_spawn(_run_inline, errors, cancel, stage, in_q, out_q, metrics, cancel))
+                continue
+            pool_type = ProcessPoolExecutor if stage.processes else ThreadPoolExecutor
+            executor: Executor = pool_type(stage.workers)
+            executors.append(executor)
+            pending: queue.Queue = queue.Queue(2 * stage.workers)
+            threads.append(_spawn(
+                _submit, errors, cancel, stage, executor, in_q, pending, metrics, cancel
+            ))
+            threads.append(_spawn(_collect, errors, cancel, stage, pending, out_q, metrics, cancel))
+
+        started = time.perf_counter()
+        try:
+            while True:
+                a = _get(queues[-1], cancel)
+                if a is _DONE:
+                    break
+                yield a
+        except _Cancelled:
+            pass
+        finally:
+            # stops the other threads if we didn't get to the end
+            cancel.set()
+            for thread in threads:
+                thread.join()
+            for executor in executors:
+                executor.shutdown(cancel_futures=True)
+            for metrics in self._metrics:
+                metrics.wall_seconds = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+
+def _spawn(target: Callable[..., None], errors: list, cancel: threading.Event, *args) -> threading.Thread:
+    def run() -> None:
+        try:
+            target(*args)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            cancel.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _get(q: queue.Queue, cancel: threading.Event) -> Any:
+    while True:
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            if cancel.is_set():
+                raise _Cancelled
+
+
+def _put(q: queue.Queue, item: Any, cancel: threading.Event) -> None:
+    while True:
+        try:
+            return q.put(item, timeout=_POLL_SECONDS)
+        except queue.Full:
+            if cancel.is_set():
+                raise _Cancelled
+
+
+def _timed_call(fn: Callable[[Any], Any], a: Any) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    return fn(a), time.perf_counter() - start
+
+
+def _emit(
+    stage: _Stage, a: Any, result: Any, out_q: queue.Queue, metrics: StageMetrics, cancel: threading.Event
+) -> None:
+    if stage.kind == "map":
+        _put(out_q, result, cancel)
+        metrics.items_out += 1
+    elif stage.kind == "filter":
+        if result:
+            _put(out_q, a, cancel)
+            metrics.items_out += 1
+    else:
+        for b in result:
+            _put(out_q, b, cancel)
+            metrics.items_out += 1
+
+
+def _feed_source(
+    source: Callable[[], Iterable[Any]], out_q: queue.Queue, metrics: StageMetrics, cancel: threading.Event
+) -> None:
+    for a in source():
+        metrics.items_in += 1
+        _put(out_q, a, cancel)
+        metrics.items_out += 1
+    _put(out_q, _DONE, cancel)
+
+
+def _run_inline(
+    stage: _Stage, in_q: queue.Queue, out_q: queue.Queue, metrics: StageMetrics, cancel: threading.Event
+) -> None:
+    while True:
+        a = _get(in_q, cancel)
+        if a is _DONE:
+            return _put(out_q, _DONE, cancel)
+        metrics._sample(in_q)
+        result, seconds = _timed_call(stage.fn, a)
+        metrics.busy_seconds += seconds
+        _emit(stage, a, result, out_q, metrics, cancel)
+
+
+def _submit(
+    stage: _Stage,
+    executor: Executor,
+    in_q: queue.Queue,
+    pending: queue.Queue,
+    metrics: StageMetrics,
+    cancel: threading.Event,
+) -> None:
+    # `pending` is bounded too, which limits how many items are in flight
+    while True:
+        a = _get(in_q, cancel)
+        if a is _DONE:
+            return _put(pending, _DONE, cancel)
+        metrics._sample(in_q)
+        _put(pending, (a, executor.submit(_timed_call, stage.fn, a)), cancel)
+
+
+def _collect(
+    stage: _Stage, pending: queue.Queue, out_q: queue.Queue, metrics: StageMetrics, cancel: threading.Event
+) -> None:
+    while True:
+        entry = _get(pending, cancel)
+        if entry is _DONE:
+            return _put(out_q, _DONE, cancel)
+        a, future = entry
+        result, seconds = future.result()
+        metrics.busy_seconds += seconds
+        _emit(stage, a, result, out_q, metrics, cancel)
+
+
+if __name__ == "__main__":
+    # these lines should typecheck
+    a: Functor[int] = Pipeline.from_iterable([1, 2, 3])
+    b: Monad[int] = Pipeline.from_iterable([1, 2, 3]).chain(lambda n: [n, n])
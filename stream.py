@@ -0,0 +1,261 @@
+from __future__ import annotations
+from functools import reduce
+from itertools import islice
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from basic_types import Eval, Later, List, Now, _Memo
+from functional_typeclasses import *
+
+A = TypeVar("A")
+A_co = TypeVar("A_co", covariant=True)
+B = TypeVar("B")
+Acc = TypeVar("Acc")
+
+Cell = Optional[Tuple[A, "Stream[A]"]]
+
+
+class Stream(Show, Generic[A_co]):
+    """A lazy, possibly infinite sequence. A `Stream` is a memoized thunk that
+    produces either `None` (the empty stream) or a cons cell holding the head and
+    the rest of the stream. Elements are only computed when something asks for
+    them, and each one is computed at most once.
+
+    Iterating over a stream does not keep its head alive, so once nothing else
+    refers to the start of a stream, the part that has already been consumed can
+    be garbage collected. This keeps memory bounded when streaming large inputs.
+    Note that passing a stream straight to a builtin like `sum` keeps it alive for
+    the duration of the call; use `foldl`, or pass `iter(stream)` instead.
+
+    Transformations like `map` and `take` work on the cells directly, and the
+    cells are forced on `Eval`'s trampoline, so any number of them can be stacked.
+
+    >>> def naturals():
+    ...     n = 0
+    ...     while True:
+    ...         yield n
+    ...         n += 1
+    >>> evens = Stream.from_iterable(naturals()).map(lambda n: 2 * n)
+    >>> evens.take(5)
+    Stream(...)
+    >>> list(evens.take(5))
+    [0, 2, 4, 6, 8]
+    >>> evens.drop(3).take_while(lambda n: n < 12).foldl(lambda acc, n: acc + n, 0)
+    24
+    >>> evens.foldr_lazy(lambda n, rest: Eval.now(n) if n > 100 else rest,
+    ...                  Eval.now(-1)).value()
+    102
+    >>> deep = evens
+    >>> for _ in range(10000):
+    ...     deep = deep.map(lambda n: n + 1)
+    >>> list(deep.take(3))
+    [10000, 10002, 10004]
+    """
+
+    def __init__(self, cell: Eval[Cell[A_co]]) -> None:
+        self._cell = cell
+
+    @classmethod
+    def from_iterable(cls, iterable: Iterable[A]) -> Stream[A]:
+        iterator = iter(iterable)
+
+        def step() -> Cell[A]:
+            for a in iterator:
+                return a, Stream(Eval.later(step))
+            return None
+
+        return Stream(Eval.later(step))
+
+    @classmethod
+    def from_file(cls, fname: str) -> Stream[str]:
+        """Lazily streams the lines of the file `fname`. The file is closed once
+        the last line has been read."""
+
+        def lines() -> Iterator[str]:
+            with open(fname, "r") as f:
+                yield from f
+
+        return Stream.from_iterable(lines())
+
+    @classmethod
+    def of(cls, *args: A) -> Stream[A]:
+        return Stream.from_iterable(args)
+
+    @classmethod
+    def empty(cls) -> Stream[A_co]:
+        return Stream(Eval.now(None))
+
+    def map(self: Stream[A_co], fn: Callable[[A_co,], B]) -> Stream[B]:
+        def step(cell: Cell[A_co]) -> Eval[Cell[B]]:
+            return Now(None if cell is None else (fn(cell[0]), cell[1].map(fn)))
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def chain(self: Stream[A_co], fn: Callable[[A_co,], Iterable[B]]) -> Stream[B]:
+        def step(cell: Cell[A_co]) -> Eval[Cell[B]]:
+            if cell is None:
+                return Eval.now(None)
+            return _to_stream(fn(cell[0])).combine(cell[1].chain(fn))._cell
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def combine(self: Stream[A_co], other: Stream[A_co]) -> Stream[A_co]:
+        def step(cell: Cell[A_co]) -> Eval[Cell[A_co]]:
+            return other._cell if cell is None else Eval.now((cell[0], cell[1].combine(other)))
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def foldl(self: Stream[A_co], fn: Callable[[Acc, A_co], Acc], initial: Acc) -> Acc:
+        iterator = iter(self)
+        del self  # don't keep the head alive while folding
+        return reduce(fn, iterator, initial)
+
+    def foldr(self: Stream[A_co], fn: Callable[[A_co, Acc], Acc], initial: Acc) -> Acc:
+        return reduce(lambda acc, a: fn(a, acc), reversed(list(self)), initial)
+
+    def foldr_lazy(
+        self: Stream[A_co], fn: Callable[[A_co, Eval[Acc]], Eval[Acc]], initial: Eval[Acc]
+    ) -> Eval[Acc]:
+        def go(stream: Stream[A_co]) -> Eval[Acc]:
+            cell = stream._cell.value()
+            if cell is None:
+                return initial
+            head, tail = cell
+            return fn(head, Eval.defer(lambda: go(tail)))
+
+        return Eval.defer(lambda: go(self))
+
+    def take(self: Stream[A_co], n: int) -> Stream[A_co]:
+        if n <= 0:
+            return Stream.empty()
+
+        def step(cell: Cell[A_co]) -> Eval[Cell[A_co]]:
+            return Now(None if cell is None else (cell[0], cell[1].take(n - 1)))
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def drop(self: Stream[A_co], n: int) -> Stream[A_co]:
+        return Stream(Eval.defer(lambda: _drop(self._cell, n)).memoize())
+
+    def take_while(self: Stream[A_co], pred: Callable[[A_co,], bool]) -> Stream[A_co]:
+        def step(cell: Cell[A_co]) -> Eval[Cell[A_co]]:
+            if cell is None or not pred(cell[0]):
+                return Now(None)
+            return Now((cell[0], cell[1].take_while(pred)))
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def zip(self: Stream[A_co], other: Iterable[B]) -> Stream[Tuple[A_co, B]]:
+        others = _to_stream(other)
+
+        def step(cell: Cell[A_co]) -> Eval[Cell[Tuple[A_co, B]]]:
+            if cell is None:
+                return Eval.now(None)
+            return others._cell.map(
+                lambda other_cell: None if other_cell is None
+                else ((cell[0], other_cell[0]), cell[1].zip(other_cell[1]))
+            )
+
+        return Stream(self._cell.chain(step).memoize())
+
+    def sort_by(self: Stream[A_co], key: Callable[[A_co,], Any], max_in_memory: Optional[int] = None) -> Stream[A_co]:
+        """Sorts the (finite) stream by `key`, spilling to disk when it is longer
+        than `max_in_memory`; see `external_sort`.
+
+        >>> list(Stream.of(3, -1, 2).sort_by(abs))
+        [-1, 2, 3]
+        """
+        from external_sort import DEFAULT_MAX_IN_MEMORY, sort_by
+        iterator = iter(self)
+        del self  # don't keep the head alive while sorting
+        if max_in_memory is None:
+            max_in_memory = DEFAULT_MAX_IN_MEMORY
+        return sort_by(iterator, key, max_in_memory)
+
+    def group_by(
+        self: Stream[A_co], key: Callable[[A_co,], B], max_in_memory: Optional[int] = None
+    ) -> Stream[Tuple[B, List[A_co]]]:
+        """Groups the (finite) stream's elements by `key`, in order of their keys."""
+        from external_sort import DEFAULT_MAX_IN_MEMORY, group_by
+        iterator = iter(self)
+        del self  # don't keep the head alive while sorting
+        if max_in_memory is None:
+            max_in_memory = DEFAULT_MAX_IN_MEMORY
+        return group_by(iterator, key, max_in_memory)
+
+    def chunks(self: Stream[A_co], size: int) -> Iterator[List[A_co]]:
+        """Iterates over the stream `size` elements at a time. The last chunk
+        may be shorter.
+
+        >>> list(Stream.of(1, 2, 3, 4, 5).chunks(2))
+        [List(1, 2), List(3, 4), List(5)]
+        """
+        if size < 1:
+            raise ValueError(f"size must be at least 1, not {size}.")
+        # the generator only gets the iterator, so it doesn't keep the head alive
+        return _chunks(iter(self), size)
+
+    def __iter__(self) -> Iterator[A_co]:
+        return _iterate(self)
+
+    def __repr__(self) -> str:
+        """Shows the elements that have been computed so far, without forcing
+        any more of them.
+
+        >>> s = Stream.of(1, 2, 3)
+        >>> _ = list(s.take(2))
+        >>> s
+        Stream(1, 2, ...)
+        """
+        shown = []
+        stream: Stream[Any] = self
+        while _is_forced(stream._cell):
+            cell = stream._cell.value()
+            if cell is None:
+                return f"{self.__class__.__name__}(" + ", ".join(shown) + ")"
+            shown.append(repr(cell[0]))
+            stream = cell[1]
+        return f"{self.__class__.__name__}(" + ", ".join(shown + ["..."]) + ")"
+
+
+def _iterate(stream: Stream[A]) -> Iterator[A]:
+    # only the current position is kept alive, not the head of the stream
+    while True:
+        cell = stream._cell.value()
+        if cell is None:
+            return
+        head, stream = cell
+        yield head
+
+
+def _chunks(iterator: Iterator[A], size: int) -> Iterator[List[A]]:
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield List.of(*chunk)
+
+
+def _to_stream(iterable: Iterable[A]) -> Stream[A]:
+    return iterable if isinstance(iterable, Stream) else Stream.from_iterable(iterable)
+
+
+def _drop(cell: Eval[Cell[A]], n: int) -> Eval[Cell[A]]:
+    # each step is chained rather than forced, so it all runs on one trampoline
+    if n <= 0:
+        return cell
+    return cell.chain(lambda c: Eval.now(None) if c is None else _drop(c[1]._cell, n - 1))
+
+
+def _is_forced(cell: Eval[Any]) -> bool:
+    if isinstance(cell, Later):
+        return cell._thunk is None
+    if isinstance(cell, _Memo):
+        return cell._source is None
+    return isinstance(cell, Now)
+
+
+if __name__ == "__main__":
+    # these lines should typecheck
+    a: Monad[int] = Stream.of(1, 2, 3)
+    b: Foldable[int] = Stream.of(1, 2, 3)
+    c: Monoid = Stream.of(1, 2, 3)